@@ -1,55 +1,180 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
 from collections import Counter
-import matplotlib.pyplot as plt
-from sklearn.feature_extraction.text import TfidfVectorizer
-import pandas as pd
+import heapq
+import io
+import matplotlib.style
+from matplotlib.figure import Figure
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 import re # Import the regular expressions library
 
 # Import your token from config.py
 from config import GITHUB_TOKEN
 
-# --- GitHub API Helper Functions (No changes from original) ---
+# --- GitHub API Helper Functions ---
+CACHE_PATH = ".github_cache.sqlite"
+
+class GitHubAPIError(Exception):
+    """Raised by the cached fetchers on failure; st.cache_data doesn't memoize exceptions."""
+
+@st.cache_resource
+def get_session():
+    """Builds one pooled, retrying session that survives Streamlit reruns."""
+    session = requests.Session()
+    session.headers.update({'Authorization': f'token {GITHUB_TOKEN}'})
+    # Hand the last 5xx back instead of raising, so callers' non-200 handling applies
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                    raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retries)
+    session.mount('https://', adapter)
+    return session
+
+# Fetched once per run on the script thread; worker threads reuse it directly
+SESSION = get_session()
+
+def cached_get(url, headers=None):
+    """GETs a URL, revalidating any stored copy with its ETag.
+
+    Returns a (body_bytes, links) tuple, or (None, {}) on failure.
+    """
+    with closing(sqlite3.connect(CACHE_PATH, timeout=10)) as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(url TEXT PRIMARY KEY, etag TEXT, link TEXT, body BLOB)"
+        )
+        row = conn.execute(
+            "SELECT etag, link, body FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row:
+            headers = {**(headers or {}), 'If-None-Match': row[0]}
+        response = SESSION.get(url, headers=headers)
+
+        # 304s don't count against the rate limit and carry no body
+        if response.status_code == 304 and row:
+            links = {}
+            for link in requests.utils.parse_header_links(row[1]):
+                links[link.get('rel') or link.get('url')] = link
+            return row[2], links
+        if response.status_code != 200:
+            return None, {}
+
+        etag = response.headers.get('ETag')
+        if etag:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (url, etag, response.headers.get('Link', ''), response.content),
+                )
+        return response.content, response.links
+
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_user_data(username):
-    """Fetches basic user data."""
+    """Fetches basic user data. Raises GitHubAPIError on failure."""
     url = f"https://api.github.com/users/{username}"
-    headers = {'Authorization': f'token {GITHUB_TOKEN}'}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    return None
+    body, _ = cached_get(url)
+    if body is None:
+        raise GitHubAPIError(url)
+    return orjson.loads(body)
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_repos(username):
-    """Fetches all public repositories for a user."""
-    repos = []
-    page = 1
-    while True:
-        url = f"https://api.github.com/users/{username}/repos?per_page=100&page={page}"
-        headers = {'Authorization': f'token {GITHUB_TOKEN}'}
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            if not data:
-                break
-            repos.extend(data)
-            page += 1
-        else:
-            return None
+    """Fetches all public repositories for a user. Raises GitHubAPIError on failure."""
+    base_url = f"https://api.github.com/users/{username}/repos?type=owner&per_page=100"
+
+    def fetch_page(page):
+        return cached_get(f"{base_url}&page={page}")
+
+    # Page 1 tells us, via the Link header, how many pages there are
+    body, links = fetch_page(1)
+    if body is None:
+        raise GitHubAPIError(base_url)
+    data = orjson.loads(body)
+    repos = list(data)
+    page = 2
+
+    if 'last' in links:
+        query = parse_qs(urlparse(links['last']['url']).query)
+        last_page = int(query['page'][0])
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            # map() yields in submission order, so repos stay in API order
+            for body, _ in executor.map(fetch_page, range(2, last_page + 1)):
+                if body is None:
+                    raise GitHubAPIError(base_url)
+                data = orjson.loads(body)
+                repos.extend(data)
+        page = last_page + 1
+
+    # A 304 on page 1 replays its cached Link header, which can predate new
+    # pages, so keep walking sequentially while the last page came back full
+    while len(data) == 100:
+        body, _ = fetch_page(page)
+        if body is None:
+            raise GitHubAPIError(base_url)
+        data = orjson.loads(body)
+        repos.extend(data)
+        page += 1
     return repos
 
-def get_readme_content(repo_full_name):
-    """Fetches the README content for a single repository."""
-    url = f"https://api.github.com/repos/{repo_full_name}/readme"
-    headers = {
-        'Authorization': f'token {GITHUB_TOKEN}',
-        'Accept': 'application/vnd.github.v3.raw'
+README_QUERY = """
+query($login: String!, $cursor: String) {
+  repositoryOwner(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER,
+                 isFork: false, privacy: PUBLIC) {
+      pageInfo { hasNextPage endCursor }
+      nodes { object(expression: "HEAD:README.md") { ... on Blob { text } } }
     }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.text
-    return ""
+  }
+}
+"""
+
+def get_readmes(username):
+    """Fetches README.md content for a user's own, non-fork repositories via GraphQL."""
+    url = "https://api.github.com/graphql"
+    headers = {'Authorization': f'bearer {GITHUB_TOKEN}'}
+    readmes = []
+    cursor = None
+    # Forks are filtered server-side and only README text is transferred,
+    # 100 repositories per request. A failed page raises rather than
+    # returning a partial list that extract_keywords would cache.
+    while True:
+        variables = {'login': username, 'cursor': cursor}
+        response = SESSION.post(url, json={'query': README_QUERY, 'variables': variables}, headers=headers)
+        if response.status_code != 200:
+            raise GitHubAPIError(url)
+        owner = (orjson.loads(response.content).get('data') or {}).get('repositoryOwner')
+        if not owner:
+            raise GitHubAPIError(url)
+        repositories = owner['repositories']
+        for node in repositories['nodes']:
+            blob = node.get('object') or {}
+            readmes.append(blob.get('text') or "")
+        if not repositories['pageInfo']['hasNextPage']:
+            break
+        cursor = repositories['pageInfo']['endCursor']
+    return readmes
 
 # --- Analysis Functions ---
+# The bracketed parts exclude their own opening delimiter, so a failed match
+# stops at the next '<' or '![' instead of rescanning the rest of the line
+# (the lazy '.*?' versions went quadratic on unbalanced brackets)
+README_NOISE_RE = re.compile(
+    r'http\S+|www\S+'                     # URLs
+    r'|!\[[^\[\]\n]*\]\([^()\n]*\)'       # markdown images
+    r'|<[^<>\n]*>'                        # HTML tags
+)
+# Keywords come from headers and intros; trailing text barely moves the top
+# terms but would dominate cleaning time on very long READMEs
+README_MAX_CHARS = 8192
+# Every ASCII byte except letters and the space character
+NON_ALPHA_BYTES = bytes(b for b in range(128) if not chr(b).isalpha() and b != ord(' '))
+
 def analyze_languages(repos):
     """Counts the primary language for each repo."""
     if not repos:
@@ -61,81 +186,97 @@ def get_top_repos(repos):
     """Finds the top 5 repos by star count."""
     if not repos:
         return []
-    sorted_repos = sorted(repos, key=lambda x: x['stargazers_count'], reverse=True)
-    return sorted_repos[:5]
+    # Only the top 5 are needed, so avoid sorting the whole list
+    return heapq.nlargest(5, repos, key=lambda x: x['stargazers_count'])
 
-def extract_keywords(repos):
-    """Cleans README text and extracts top keywords using TF-IDF."""
-    readmes = [get_readme_content(repo['full_name']) for repo in repos if not repo['fork']]
-    if not any(readmes):
-        return []
+def clean_readme(text):
+    """Strips URLs, markup and non-alphabetic noise, leaving lowercase words."""
+    text = text[:README_MAX_CHARS]
+    # 1. Remove URLs, markdown images and HTML tags in one pass
+    text = README_NOISE_RE.sub('', text)
+    # 2. Collapse whitespace, drop non-ASCII and non-alphabetic characters,
+    #    then lowercase, all as C-level bytes operations
+    text = ' '.join(text.split()).encode('ascii', 'ignore')
+    return text.translate(None, NON_ALPHA_BYTES).lower().decode('ascii')
 
-    cleaned_readmes = []
-    for text in readmes:
-        # 1. Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        # 2. Remove image tags and markdown image links
-        text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
-        # 3. Remove HTML tags
-        text = re.sub(r'<.*?>', '', text)
-        # 4. Remove non-alphabetic characters (but keep spaces)
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        # 5. Convert to lowercase
-        text = text.lower()
-        cleaned_readmes.append(text)
-
-    if not any(cleaned_readmes):
-        return []
-    
-    vectorizer = TfidfVectorizer(stop_words='english', max_features=15)
-    try:
-        vectorizer.fit_transform(cleaned_readmes)
-        return vectorizer.get_feature_names_out().tolist()
-    except ValueError:
-        # This can happen if all text is filtered out
+@st.cache_data(ttl=3600, show_spinner=False)
+def extract_keywords(username):
+    """Cleans README text of a user's non-fork repos and extracts the most frequent keywords."""
+    readmes = get_readmes(username)
+    # Skip missing READMEs and ones with no words left after cleaning in a
+    # single pass, then check for an empty result once
+    cleaned_readmes = [text for text in map(clean_readme, filter(None, readmes)) if text.strip()]
+    if not cleaned_readmes:
         return []
 
+    # TfidfVectorizer(max_features=15) picked its features by raw corpus
+    # frequency anyway; counting tokens directly skips the sparse matrix.
+    # Counter.update counts in C, so stop words and single letters (which its
+    # token_pattern skipped) are removed afterwards, once per distinct word.
+    counts = Counter()
+    for text in cleaned_readmes:
+        counts.update(text.split())
+    for word in [w for w in counts if len(w) < 2 or w in ENGLISH_STOP_WORDS]:
+        del counts[word]
+    return [word for word, _ in counts.most_common(15)]
+
 
 # --- Visualization Function (Modified for Streamlit) ---
+# Setting the same style on every rerun is idempotent, so concurrent sessions
+# never see rcParams change under them mid-render
+matplotlib.style.use('seaborn-v0_8-paper')
+
+@st.cache_data(max_entries=100, show_spinner=False)
 def create_language_chart(lang_data, username):
-    """Creates a bar chart and returns the Matplotlib figure."""
+    """Creates a bar chart and returns it rendered as PNG bytes.
+
+    lang_data must be a tuple so it can key the cache. The chart is drawn
+    on a standalone Figure rather than through pyplot, so renders from
+    different sessions share no global state.
+    """
     if not lang_data:
         return None
     
     languages, counts = zip(*lang_data)
     
-    plt.style.use('seaborn-v0_8-paper')
-    fig, ax = plt.subplots(figsize=(5, 3.5))
+    fig = Figure(figsize=(5, 3.5))
+    ax = fig.subplots()
     ax.bar(languages, counts, color='#3498DB')
     ax.set_title(f"Top Languages for {username}", fontsize=12)
     ax.set_ylabel("Repo Count", fontsize=9)
-    plt.xticks(rotation=45, ha="right", fontsize=9)
-    plt.yticks(fontsize=9)
-    plt.tight_layout()
-    return fig
+    ax.tick_params(axis='x', labelrotation=45, labelsize=9)
+    ax.tick_params(axis='y', labelsize=9)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
+
+    # Same settings st.pyplot renders with
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    return buffer.getvalue()
 
 # --- Report Generation Function ---
 def generate_report_text(user_data, repos, lang_data, top_repos, keywords):
-    report = f"GitHub Profile Analysis Report for {user_data.get('name', user_data['login'])}\n"
-    report += "="*40 + "\n\n"
-    report += "--- User Stats ---\n"
-    report += f"Public Repos: {user_data.get('public_repos', 'N/A')}\n"
-    report += f"Followers: {user_data.get('followers', 'N/A')}\n"
-    report += f"Member Since: {user_data.get('created_at', '').split('T')[0]}\n\n"
-    report += "--- Top 5 Repositories by Stars ---\n"
-    for repo in top_repos:
-        report += f"- {repo['name']} ({repo['stargazers_count']} ★)\n"
-    report += "\n"
-    report += "--- Top 5 Programming Languages ---\n"
+    parts = [
+        f"GitHub Profile Analysis Report for {user_data.get('name', user_data['login'])}\n",
+        "="*40 + "\n\n",
+        "--- User Stats ---\n",
+        f"Public Repos: {user_data.get('public_repos', 'N/A')}\n",
+        f"Followers: {user_data.get('followers', 'N/A')}\n",
+        f"Member Since: {user_data.get('created_at', '').split('T')[0]}\n\n",
+        "--- Top 5 Repositories by Stars ---\n",
+    ]
+    parts.extend(f"- {repo['name']} ({repo['stargazers_count']} ★)\n" for repo in top_repos)
+    parts.append("\n")
+    parts.append("--- Top 5 Programming Languages ---\n")
     if lang_data:
-        for lang, count in lang_data:
-            report += f"- {lang}: {count} repos\n"
+        parts.extend(f"- {lang}: {count} repos\n" for lang, count in lang_data)
     else:
-        report += "No language data found.\n"
-    report += "\n"
-    report += "--- Top Project Keywords ---\n"
-    report += ", ".join(keywords) + "\n"
-    return report
+        parts.append("No language data found.\n")
+    parts.append("\n")
+    parts.append("--- Top Project Keywords ---\n")
+    parts.append(", ".join(keywords) + "\n")
+    return "".join(parts)
 
 # --- Streamlit UI ---
 st.set_page_config(layout="wide")
@@ -148,16 +289,27 @@ if st.button("Analyze"):
         st.warning("Please enter a username.")
     else:
         with st.spinner("Fetching and analyzing data..."):
-            user_data = get_user_data(username)
+            # Failures raise out of the cached fetchers so they aren't memoized;
+            # fall back to the empty results the dashboard already handles
+            try:
+                user_data = get_user_data(username)
+            except GitHubAPIError:
+                user_data = None
             if not user_data:
                 st.error("Could not find GitHub user. Please check the username.")
             else:
-                repos = get_repos(username)
+                try:
+                    repos = get_repos(username)
+                except GitHubAPIError:
+                    repos = None
                 
                 # Perform all analyses
                 lang_data = analyze_languages(repos)
                 top_repos = get_top_repos(repos)
-                keywords = extract_keywords(repos)
+                try:
+                    keywords = extract_keywords(username)
+                except GitHubAPIError:
+                    keywords = []
                 
                 # --- Build the Dashboard ---
                 col1, col2 = st.columns([1, 1.5])
@@ -182,9 +334,9 @@ if st.button("Analyze"):
 
                 with col2:
                     st.subheader("Language Breakdown")
-                    chart_fig = create_language_chart(lang_data, username)
-                    if chart_fig:
-                        st.pyplot(chart_fig)
+                    chart_png = create_language_chart(tuple(lang_data or ()), username)
+                    if chart_png:
+                        st.image(chart_png)
                     else:
                         st.write("Not enough language data to generate a chart.")
 
@@ -194,14 +346,15 @@ if st.button("Analyze"):
                 with col_details1:
                     st.markdown("**Top Repositories by Stars**")
                     if top_repos:
-                        # Use st.dataframe for a cleaner, error-free table
-                        repo_display_df = pd.DataFrame({
+                        # Use st.dataframe for a cleaner, error-free table;
+                        # it takes a dict of columns directly
+                        repo_display = {
                             "Repository": [repo['name'] for repo in top_repos],
                             "Stars ★": [repo['stargazers_count'] for repo in top_repos],
                             "URL": [repo['html_url'] for repo in top_repos]
-                        })
+                        }
                         st.dataframe(
-                            repo_display_df,
+                            repo_display,
                             column_config={
                                 "URL": st.column_config.LinkColumn("Link to Repo")
                             },